@@ -1,23 +1,42 @@
+import base64
 import json
 import logging
 import os
 import re
+import time
 import uuid
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-import boto3
 from botocore.config import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
+
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json when the wheel isn't bundled
+    orjson = None
 
 # ---------- Logging ----------
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
+if orjson is None:
+    logger.warning("orjson not bundled; falling back to stdlib json")
 
 # ---------- Constants ----------
 JSON_CT_RE = re.compile(r"^application/json(?:\s*;.*)?$", re.IGNORECASE)
+TODO_ITEM_RE = re.compile(r"^/todos/([^/]+)$")
+# Date plus time; seconds, fraction and offset optional (naive datetimes stay valid).
+ISO_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:\d{2})?$")
 DEFAULT_PAGE_SIZE = 20
 MAX_TITLE_LEN = 140
+MAX_BATCH_ITEMS = 100
+BATCH_WRITE_SIZE = 25  # BatchWriteItem hard limit per request
+BATCH_RETRY_DELAYS = (0.05, 0.1, 0.2)
+# List queries read the createdAt-sorted GSI under one fixed partition (see README).
+LIST_INDEX_NAME = "byCreatedAt-index"
+LIST_PK_ATTR = "listPk"
+LIST_PARTITION = "TODO"
+CONDITIONAL_CHECK_FAILED = "ConditionalCheckFailedException"
 
 # ---------- Headers ----------
 CORS_HEADERS = {
@@ -36,29 +55,98 @@ SECURITY_HEADERS = {
     "Referrer-Policy": "no-referrer",
 }
 
+# Shared by every response; never mutate it, merge into a new dict instead.
+_BASE_HEADERS = {**CORS_HEADERS, **SECURITY_HEADERS}
+
 # ---------- DynamoDB init (reused across invocations) ----------
 _TABLE_NAME = os.environ.get("TABLE_NAME")
 if not _TABLE_NAME:
     raise RuntimeError("Missing required env var: TABLE_NAME")
 
-_ddb = boto3.resource(
-    "dynamodb",
-    config=Config(retries={"max_attempts": 5, "mode": "standard"})
-)
-_table = _ddb.Table(_TABLE_NAME)
+# Created on first use so cold starts that never touch DynamoDB (health,
+# preflight, validation errors) skip loading botocore's service models.
+_client = None
+
+def _get_client() -> Any:
+    global _client
+    if _client is None:
+        import botocore.session
+        _client = botocore.session.Session().create_client(
+            "dynamodb",
+            config=Config(retries={"max_attempts": 5, "mode": "standard"})
+        )
+    return _client
 
 # ---------- Utilities ----------
+# Last formatted second and its "YYYY-MM-DDTHH:MM:SS." prefix; warm containers
+# stamp many writes within the same second, so only the fraction is re-rendered.
+_iso_sec = -1
+_iso_prefix = ""
+
 def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    global _iso_sec, _iso_prefix
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    if sec != _iso_sec:
+        t = time.gmtime(sec)
+        _iso_prefix = (
+            f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+            f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}."
+        )
+        _iso_sec = sec
+    return f"{_iso_prefix}{ns // 1000:06d}Z"
+
+# Random bytes for todo ids, refilled 4 KiB (256 ids) at a time to avoid a
+# getrandom() syscall per create.
+_rand_buf = b""
+_rand_off = 0
+
+def new_id() -> str:
+    """Random UUIDv4 in 32-char hex form (no dashes)."""
+    global _rand_buf, _rand_off
+    if _rand_off + 16 > len(_rand_buf):
+        _rand_buf = os.urandom(4096)
+        _rand_off = 0
+    b = bytearray(_rand_buf[_rand_off:_rand_off + 16])
+    _rand_off += 16
+    b[6] = (b[6] & 0x0F) | 0x40  # version 4
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    return b.hex()
+
+def str_attr(value: Optional[str]) -> Dict[str, Any]:
+    return {"NULL": True} if value is None else {"S": value}
+
+def unmarshal_value(attr: Dict[str, Any]) -> Any:
+    # Only the scalar types this schema writes; numbers skip the Decimal round-trip.
+    if "S" in attr:
+        return attr["S"]
+    if "N" in attr:
+        n = attr["N"]
+        return float(n) if "." in n or "e" in n or "E" in n else int(n)
+    if "BOOL" in attr:
+        return attr["BOOL"]
+    if "NULL" in attr:
+        return None
+    raise ValueError(f"Unsupported DynamoDB attribute type: {next(iter(attr), None)}")
+
+def unmarshal(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: unmarshal_value(v) for k, v in item.items() if k != LIST_PK_ATTR}
+
+def dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+def loads(raw: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 def json_response(status: int, body: Dict[str, Any], extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-    headers = {**CORS_HEADERS, **SECURITY_HEADERS}
-    if extra_headers:
-        headers.update(extra_headers)
+    headers = {**_BASE_HEADERS, **extra_headers} if extra_headers else _BASE_HEADERS
     return {
         "statusCode": status,
         "headers": headers,
-        "body": json.dumps(body, separators=(",", ":"), ensure_ascii=False),
+        "body": dumps(body),
     }
 
 def error(status: int, code: str, message: str, details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -75,20 +163,22 @@ def parse_json_body(event: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Op
     try:
         raw = event.get("body") or "{}"
         if event.get("isBase64Encoded"):
-            import base64
-            raw = base64.b64decode(raw).decode("utf-8")
-        return json.loads(raw), None
+            # Both loaders accept UTF-8 bytes, so skip the intermediate str.
+            raw = base64.b64decode(raw)
+        return loads(raw), None
     except Exception:
         return None, error(400, "INVALID_JSON", "Request body is not valid JSON")
 
 def validate_due_date(value: Optional[str]) -> bool:
     if value is None:
         return True
+    # Cheap shape check first so garbage never reaches the full parser.
+    if not isinstance(value, str) or not ISO_DATETIME_RE.match(value):
+        return False
     try:
-        v = value.replace("Z", "+00:00")
-        datetime.fromisoformat(v)
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
         return True
-    except Exception:
+    except ValueError:
         return False
 
 def get_path_method(event: Dict[str, Any]) -> Tuple[str, str]:
@@ -103,7 +193,7 @@ def get_path_method(event: Dict[str, Any]) -> Tuple[str, str]:
     # 1) Prefer routeKey when present (HTTP API v2)
     route_key = (event.get("requestContext") or {}).get("routeKey")
     if isinstance(route_key, str) and " " in route_key:
-        m, p = route_key.split(" ", 1)
+        m, _, p = route_key.partition(" ")
         return p or "/", (m or "").upper()
 
     # 2) REST API v1 fallback
@@ -122,9 +212,85 @@ def get_path_method(event: Dict[str, Any]) -> Tuple[str, str]:
     method = (rc_http.get("method") or "").upper()
     return path or "/", method
 
-def last_eval_cursor(res: Dict[str, Any]) -> Optional[str]:
-    lek = res.get("LastEvaluatedKey") or {}
-    return lek.get("id")
+def encode_cursor(res: Dict[str, Any]) -> Optional[str]:
+    lek = res.get("LastEvaluatedKey")
+    if not lek:
+        return None
+    # The partition is implied, so only the table key and GSI sort key travel.
+    keys = {"id": lek["id"]["S"], "createdAt": lek["createdAt"]["S"]}
+    return base64.urlsafe_b64encode(dumps(keys).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Turn a cursor produced by encode_cursor back into an ExclusiveStartKey.
+    Raises ValueError if the cursor is malformed.
+    """
+    keys = loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    if not isinstance(keys, dict):
+        raise ValueError("malformed cursor")
+    # DynamoDB rejects empty key values, so catch them here as a client error.
+    if not all(isinstance(keys.get(k), str) and keys[k] for k in ("id", "createdAt")):
+        raise ValueError("malformed cursor")
+    return {
+        "id": {"S": keys["id"]},
+        "createdAt": {"S": keys["createdAt"]},
+        LIST_PK_ATTR: {"S": LIST_PARTITION},
+    }
+
+def validate_new_todo(body: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    title = body.get("title")
+    if not isinstance(title, str) or not title.strip():
+        return "MISSING_TITLE", "'title' is required"
+    if len(title) > MAX_TITLE_LEN:
+        return "TITLE_TOO_LONG", f"'title' must be ≤ {MAX_TITLE_LEN} characters"
+    if not validate_due_date(body.get("dueDate")):
+        return "INVALID_DUE_DATE", "'dueDate' must be RFC3339/ISO-8601"
+    return None
+
+def new_todo(body: Dict[str, Any], now: str) -> Dict[str, Any]:
+    return {
+        "id": new_id(),
+        "title": body["title"].strip(),
+        "dueDate": body.get("dueDate"),
+        "createdAt": now,
+        "updatedAt": now,
+    }
+
+def marshal_todo(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": {"S": item["id"]},
+        "title": {"S": item["title"]},
+        "dueDate": str_attr(item["dueDate"]),
+        "createdAt": {"S": item["createdAt"]},
+        "updatedAt": {"S": item["updatedAt"]},
+        LIST_PK_ATTR: {"S": LIST_PARTITION},
+    }
+
+def batch_write(write_requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Write in chunks of BATCH_WRITE_SIZE, retrying UnprocessedItems with backoff.
+    Returns the write requests that were still unprocessed after the last retry.
+    A ClientError or transport error stops the batch: the failing chunk's pending requests and all
+    later chunks are returned as unprocessed, since earlier chunks are already written.
+    """
+    unprocessed: List[Dict[str, Any]] = []
+    for start in range(0, len(write_requests), BATCH_WRITE_SIZE):
+        pending = {_TABLE_NAME: write_requests[start:start + BATCH_WRITE_SIZE]}
+        try:
+            for delay in (*BATCH_RETRY_DELAYS, None):
+                res = _get_client().batch_write_item(RequestItems=pending)
+                pending = res.get("UnprocessedItems") or {}
+                if not pending or delay is None:
+                    break
+                time.sleep(delay)
+        except (ClientError, BotoCoreError) as exc:
+            aws_error = exc.response.get("Error") if isinstance(exc, ClientError) else str(exc)
+            logger.error(dumps({"op": "batchWrite", "awsError": aws_error}))
+            unprocessed.extend(pending.get(_TABLE_NAME, []))
+            unprocessed.extend(write_requests[start + BATCH_WRITE_SIZE:])
+            break
+        unprocessed.extend(pending.get(_TABLE_NAME, []))
+    return unprocessed
 
 # ---------- Handlers ----------
 def handle_health() -> Dict[str, Any]:
@@ -134,44 +300,67 @@ def handle_create_todo(event: Dict[str, Any], request_id: str) -> Dict[str, Any]
     body, err = parse_json_body(event)
     if err:
         return err
+    if not isinstance(body, dict):
+        return error(400, "INVALID_BODY", "Request body must be a JSON object")
 
-    title = (body or {}).get("title")
-    due_date = (body or {}).get("dueDate")
+    invalid = validate_new_todo(body)
+    if invalid:
+        return error(400, *invalid)
 
-    if not isinstance(title, str) or not title.strip():
-        return error(400, "MISSING_TITLE", "'title' is required")
-    if len(title) > MAX_TITLE_LEN:
-        return error(400, "TITLE_TOO_LONG", f"'title' must be ≤ {MAX_TITLE_LEN} characters")
-    if not validate_due_date(due_date):
-        return error(400, "INVALID_DUE_DATE", "'dueDate' must be RFC3339/ISO-8601")
-
-    now = now_iso()
-    item = {
-        "id": str(uuid.uuid4()),
-        "title": title.strip(),
-        "dueDate": due_date,
-        "createdAt": now,
-        "updatedAt": now,
-    }
+    item = new_todo(body, now_iso())
     try:
-        _table.put_item(
-            Item=item,
+        _get_client().put_item(
+            TableName=_TABLE_NAME,
+            Item=marshal_todo(item),
             ConditionExpression="attribute_not_exists(id)"
         )
-        logger.info(json.dumps({"requestId": request_id, "op": "create", "id": item["id"]}))
+        logger.info(dumps({"requestId": request_id, "op": "create", "id": item["id"]}))
         return json_response(201, item)
     except ClientError as ce:
-        if ce.response["Error"]["Code"] in ("ConditionalCheckFailedException",):
+        if ce.response["Error"]["Code"] == CONDITIONAL_CHECK_FAILED:
             return error(409, "CONFLICT", "Item already exists (id collision)")
         raise
 
+def handle_batch_create_todos(event: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+    body, err = parse_json_body(event)
+    if err:
+        return err
+    if not isinstance(body, dict):
+        return error(400, "INVALID_BODY", "Request body must be a JSON object")
+
+    raw_items = body.get("items")
+    if not isinstance(raw_items, list) or not raw_items:
+        return error(400, "MISSING_ITEMS", "'items' must be a non-empty array")
+    if len(raw_items) > MAX_BATCH_ITEMS:
+        return error(400, "TOO_MANY_ITEMS", f"'items' must contain ≤ {MAX_BATCH_ITEMS} entries")
+
+    for i, raw in enumerate(raw_items):
+        if not isinstance(raw, dict):
+            return error(400, "INVALID_ITEM", "Each item must be an object", {"index": i})
+        invalid = validate_new_todo(raw)
+        if invalid:
+            return error(400, *invalid, {"index": i})
+
+    now = now_iso()
+    items = [new_todo(raw, now) for raw in raw_items]
+    unprocessed = batch_write([{"PutRequest": {"Item": marshal_todo(item)}} for item in items])
+    failed_ids = {req["PutRequest"]["Item"]["id"]["S"] for req in unprocessed}
+
+    created = [item for item in items if item["id"] not in failed_ids]
+    failed = [item for item in items if item["id"] in failed_ids]
+    logger.info(dumps({"requestId": request_id, "op": "batchCreate", "count": len(created), "unprocessed": len(failed)}))
+    if not created:
+        return error(503, "BATCH_NOT_WRITTEN", "No items could be written; retry later", {"unprocessed": failed})
+    # 207 tells the client that only some items were written; the rest are listed.
+    return json_response(207 if failed else 201, {"items": created, "unprocessed": failed})
+
 def handle_get_todo(todo_id: str, request_id: str) -> Dict[str, Any]:
-    res = _table.get_item(Key={"id": todo_id})
+    res = _get_client().get_item(TableName=_TABLE_NAME, Key={"id": {"S": todo_id}})
     item = res.get("Item")
     if not item:
         return error(404, "NOT_FOUND", "Todo not found")
-    logger.info(json.dumps({"requestId": request_id, "op": "read", "id": todo_id}))
-    return json_response(200, item)
+    logger.info(dumps({"requestId": request_id, "op": "read", "id": todo_id}))
+    return json_response(200, unmarshal(item))
 
 def handle_list_todos(event: Dict[str, Any], request_id: str) -> Dict[str, Any]:
     qs = event.get("queryStringParameters") or {}
@@ -184,15 +373,25 @@ def handle_list_todos(event: Dict[str, Any], request_id: str) -> Dict[str, Any]:
         except ValueError:
             return error(400, "INVALID_LIMIT", "'limit' must be an integer between 1 and 100")
 
-    scan_kwargs: Dict[str, Any] = {"Limit": limit}
+    query_kwargs: Dict[str, Any] = {
+        "TableName": _TABLE_NAME,
+        "IndexName": LIST_INDEX_NAME,
+        "KeyConditionExpression": f"{LIST_PK_ATTR} = :pk",
+        "ExpressionAttributeValues": {":pk": {"S": LIST_PARTITION}},
+        "ScanIndexForward": False,
+        "Limit": limit,
+    }
     if cursor:
-        scan_kwargs["ExclusiveStartKey"] = {"id": cursor}
+        try:
+            query_kwargs["ExclusiveStartKey"] = decode_cursor(cursor)
+        except ValueError:
+            return error(400, "INVALID_CURSOR", "'cursor' is not a valid pagination cursor")
 
-    res = _table.scan(**scan_kwargs)
-    items = res.get("Items", [])
-    next_cursor = last_eval_cursor(res)
+    res = _get_client().query(**query_kwargs)
+    items = [unmarshal(i) for i in res.get("Items", [])]
+    next_cursor = encode_cursor(res)
 
-    logger.info(json.dumps({"requestId": request_id, "op": "list", "count": len(items), "nextCursor": next_cursor}))
+    logger.info(dumps({"requestId": request_id, "op": "list", "count": len(items), "nextCursor": next_cursor}))
     return json_response(200, {"items": items, "nextCursor": next_cursor})
 
 def handle_update_todo(event: Dict[str, Any], todo_id: str, request_id: str) -> Dict[str, Any]:
@@ -211,55 +410,71 @@ def handle_update_todo(event: Dict[str, Any], todo_id: str, request_id: str) ->
         if len(title) > MAX_TITLE_LEN:
             return error(400, "TITLE_TOO_LONG", f"'title' must be ≤ {MAX_TITLE_LEN} characters")
         update_expr_parts.append("title = :title")
-        expr_attr_vals[":title"] = title.strip()
+        expr_attr_vals[":title"] = {"S": title.strip()}
 
     if "dueDate" in body:
         due_date = body["dueDate"]
         if not validate_due_date(due_date):
             return error(400, "INVALID_DUE_DATE", "'dueDate' must be RFC3339/ISO-8601")
         update_expr_parts.append("dueDate = :dueDate")
-        expr_attr_vals[":dueDate"] = due_date
+        expr_attr_vals[":dueDate"] = str_attr(due_date)
 
     if not update_expr_parts:
         return error(400, "NO_MUTABLE_FIELDS", "No updatable fields provided")
 
     update_expr_parts.append("updatedAt = :updatedAt")
-    expr_attr_vals[":updatedAt"] = now_iso()
+    expr_attr_vals[":updatedAt"] = {"S": now_iso()}
 
     try:
-        res = _table.update_item(
-            Key={"id": todo_id},
+        res = _get_client().update_item(
+            TableName=_TABLE_NAME,
+            Key={"id": {"S": todo_id}},
             UpdateExpression="SET " + ", ".join(update_expr_parts),
             ExpressionAttributeValues=expr_attr_vals,
             ConditionExpression="attribute_exists(id)",
             ReturnValues="ALL_NEW",
         )
-        logger.info(json.dumps({"requestId": request_id, "op": "update", "id": todo_id}))
-        return json_response(200, res.get("Attributes", {}))
+        logger.info(dumps({"requestId": request_id, "op": "update", "id": todo_id}))
+        return json_response(200, unmarshal(res.get("Attributes", {})))
     except ClientError as ce:
-        if ce.response["Error"]["Code"] in ("ConditionalCheckFailedException",):
+        if ce.response["Error"]["Code"] == CONDITIONAL_CHECK_FAILED:
             return error(404, "NOT_FOUND", "Todo not found")
         raise
 
 def handle_delete_todo(todo_id: str, request_id: str) -> Dict[str, Any]:
     try:
-        _table.delete_item(
-            Key={"id": todo_id},
+        _get_client().delete_item(
+            TableName=_TABLE_NAME,
+            Key={"id": {"S": todo_id}},
             ConditionExpression="attribute_exists(id)"
         )
-        logger.info(json.dumps({"requestId": request_id, "op": "delete", "id": todo_id}))
-        return {"statusCode": 204, "headers": {**CORS_HEADERS, **SECURITY_HEADERS}, "body": ""}
+        logger.info(dumps({"requestId": request_id, "op": "delete", "id": todo_id}))
+        return {"statusCode": 204, "headers": _BASE_HEADERS, "body": ""}
     except ClientError as ce:
-        if ce.response["Error"]["Code"] in ("ConditionalCheckFailedException",):
+        if ce.response["Error"]["Code"] == CONDITIONAL_CHECK_FAILED:
             return error(404, "NOT_FOUND", "Todo not found")
         raise
 
+# ---------- Routing (built once per container) ----------
+ROUTES = {
+    ("GET", "/health"): lambda event, rid: handle_health(),
+    ("POST", "/todos"): handle_create_todo,
+    ("POST", "/todos/batch"): handle_batch_create_todos,
+    ("GET", "/todos"): handle_list_todos,
+}
+
+ITEM_ROUTES = {
+    "GET": lambda event, todo_id, rid: handle_get_todo(todo_id, rid),
+    "PUT": handle_update_todo,
+    "DELETE": lambda event, todo_id, rid: handle_delete_todo(todo_id, rid),
+}
+
 # ---------- Main entry ----------
 def lambda_handler(event, context):
     req_id = getattr(context, "aws_request_id", None) or str(uuid.uuid4())
     path, method = get_path_method(event)
 
-    logger.info(json.dumps({
+    logger.info(dumps({
         "requestId": req_id,
         "path": path,
         "method": method,
@@ -268,33 +483,28 @@ def lambda_handler(event, context):
 
     # Preflight
     if method == "OPTIONS":
-        return {"statusCode": 204, "headers": {**CORS_HEADERS, **SECURITY_HEADERS}, "body": ""}
-
-    # Health
-    if path == "/health" and method == "GET":
-        return handle_health()
+        return {"statusCode": 204, "headers": _BASE_HEADERS, "body": ""}
 
     try:
         # Routes
-        if path == "/todos" and method == "POST":
-            return handle_create_todo(event, req_id)
-
-        if path == "/todos" and method == "GET":
-            return handle_list_todos(event, req_id)
-
-        if path.startswith("/todos/"):
-            todo_id = path.rsplit("/", 1)[-1]
-            if method == "GET":
-                return handle_get_todo(todo_id, req_id)
-            if method == "PUT":
-                return handle_update_todo(event, todo_id, req_id)
-            if method == "DELETE":
-                return handle_delete_todo(todo_id, req_id)
+        route = ROUTES.get((method, path))
+        if route:
+            return route(event, req_id)
+
+        m = TODO_ITEM_RE.match(path)
+        if m:
+            item_route = ITEM_ROUTES.get(method)
+            if item_route:
+                # With HTTP API v2 the path is the route template ("/todos/{id}"),
+                # so prefer the resolved path parameter when present.
+                todo_id = (event.get("pathParameters") or {}).get("id") or m.group(1)
+                return item_route(event, todo_id, req_id)
 
         return error(404, "ROUTE_NOT_FOUND", "Route not found")
     except ClientError as ce:
-        logger.error(json.dumps({"requestId": req_id, "awsError": ce.response.get("Error")}))
-        return error(502, "AWS_ERROR", "Upstream AWS error", {"aws": ce.response.get("Error")})
+        aws_error = ce.response.get("Error")
+        logger.error(dumps({"requestId": req_id, "awsError": aws_error}))
+        return error(502, "AWS_ERROR", "Upstream AWS error", {"aws": aws_error})
     except Exception:
         logger.exception("Unhandled error")
         return error(500, "INTERNAL_ERROR", "Unexpected server error")
@@ -27,6 +27,7 @@ resource "aws_apigatewayv2_integration" "lambda" {
 resource "aws_apigatewayv2_route" "todos" {
   for_each = {
     "POST /todos"      = "POST /todos"
+    "POST /todos/batch" = "POST /todos/batch"
     "GET /todos/{id}"  = "GET /todos/{id}"
     "GET /todos"       = "GET /todos"
     "PUT /todos/{id}"  = "PUT /todos/{id}"
@@ -6,6 +6,21 @@ resource "aws_dynamodb_table" "todos" {
     name = "id"
     type = "S"
   }
+  attribute {
+    name = "listPk"
+    type = "S"
+  }
+  attribute {
+    name = "createdAt"
+    type = "S"
+  }
+  # Newest-first listing without scanning the table
+  global_secondary_index {
+    name            = "byCreatedAt-index"
+    hash_key        = "listPk"
+    range_key       = "createdAt"
+    projection_type = "ALL"
+  }
   ttl {
     attribute_name = "ttl"
     enabled        = false
@@ -41,9 +41,13 @@ data "aws_iam_policy_document" "lambda_policy" {
       "dynamodb:PutItem",
       "dynamodb:UpdateItem",
       "dynamodb:DeleteItem",
+      "dynamodb:BatchWriteItem",
+      "dynamodb:Query",
+      # Still used by the previous Lambda's GET /todos during the GSI upgrade;
+      # drop in the release after the listing index has shipped everywhere.
       "dynamodb:Scan"
     ]
-    resources = [var.ddb_arn]
+    resources = [var.ddb_arn, "${var.ddb_arn}/index/*"]
   }
   statement {
     actions = [
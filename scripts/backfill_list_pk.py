@@ -0,0 +1,57 @@
+"""
+One-off backfill: stamp listPk on todos written before the byCreatedAt-index GSI
+existed, so they show up in GET /todos.
+
+Run after the new Lambda code is deployed (see README). Safe to re-run; items
+that already carry listPk are skipped.
+
+    python scripts/backfill_list_pk.py --table srvless-todos-todos-prod --region ap-southeast-1
+"""
+import argparse
+
+import boto3
+from botocore.exceptions import ClientError
+
+# Must match LIST_PK_ATTR / LIST_PARTITION in app/handler.py
+LIST_PK_ATTR = "listPk"
+LIST_PARTITION = "TODO"
+
+
+def backfill(table: str, region: str) -> int:
+    ddb = boto3.client("dynamodb", region_name=region)
+    updated = 0
+    pages = ddb.get_paginator("scan").paginate(
+        TableName=table,
+        ProjectionExpression="id",
+        FilterExpression="attribute_not_exists(#pk)",
+        ExpressionAttributeNames={"#pk": LIST_PK_ATTR},
+    )
+    for page in pages:
+        for item in page.get("Items", []):
+            try:
+                ddb.update_item(
+                    TableName=table,
+                    Key={"id": item["id"]},
+                    UpdateExpression="SET #pk = :pk",
+                    ConditionExpression="attribute_exists(id) AND attribute_not_exists(#pk)",
+                    ExpressionAttributeNames={"#pk": LIST_PK_ATTR},
+                    ExpressionAttributeValues={":pk": {"S": LIST_PARTITION}},
+                )
+                updated += 1
+            except ClientError as ce:
+                # Deleted or already stamped since the scan read it
+                if ce.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+    return updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--table", required=True, help="DynamoDB table name (terraform output table_name)")
+    parser.add_argument("--region", default="ap-southeast-1")
+    args = parser.parse_args()
+    print(f"Backfilled {backfill(args.table, args.region)} item(s)")
+
+
+if __name__ == "__main__":
+    main()
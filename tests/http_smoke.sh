@@ -4,5 +4,13 @@ echo "Health check:"
 curl -s "$API/health"
 echo "\nCreate todo:"
 curl -s -X POST "$API/todos" -H 'content-type: application/json' -d '{"title":"Test"}'
+echo "\nBatch create todos:"
+curl -s -X POST "$API/todos/batch" -H 'content-type: application/json' -d '{"items":[{"title":"Batch A"},{"title":"Batch B"}]}'
 echo "\nList todos:"
 curl -s "$API/todos"
+echo "\nList first page (limit=1):"
+PAGE=$(curl -s "$API/todos?limit=1")
+echo "$PAGE"
+CURSOR=$(echo "$PAGE" | python3 -c 'import json,sys; print(json.load(sys.stdin).get("nextCursor") or "")')
+echo "\nList next page (cursor=$CURSOR):"
+curl -s -G "$API/todos" --data-urlencode "limit=1" --data-urlencode "cursor=$CURSOR"